@@ -1,44 +1,169 @@
 from __future__ import annotations
 
-import random
 import time
-from collections import OrderedDict
-from typing import List, Tuple
+from functools import lru_cache, partial
+from typing import Tuple
+
+import numpy as np
+from numba import njit
 
 # 1. LRUCache
 
+_MISS = object()  # промах кешу; -1 не плутається з реальною сумою
+_RIGHT_MASK = 0xFFFFFFFF  # ключ діапазону: (left << 32) | right
+
+
+class MaxSegmentTree:
+
+    def __init__(self, size: int = 0) -> None:
+        self.size: int = size
+        self._tree: list[int] = [0] * (2 * size)
+
+    def _grow(self, min_size: int) -> None:
+        leaves = self._tree[self.size :]
+        self.size = max(min_size, 2 * self.size)
+        tree = self._tree = [0] * (2 * self.size)
+        tree[self.size : self.size + len(leaves)] = leaves
+        for i in range(self.size - 1, 0, -1):
+            tree[i] = max(tree[2 * i], tree[2 * i + 1])
+
+    def point_update(self, index: int, value: int) -> None:
+        if index >= self.size:
+            self._grow(index + 1)
+        tree = self._tree
+        i = index + self.size
+        tree[i] = value
+        i >>= 1
+        while i:
+            tree[i] = max(tree[2 * i], tree[2 * i + 1])
+            i >>= 1
+
+    def range_max(self, left: int, right: int) -> int:
+        # комірки за межами дерева ще не оновлювались — їхній максимум 0
+        right = min(right, self.size - 1)
+        tree = self._tree
+        res = 0
+        lo, hi = left + self.size, right + self.size + 1
+        while lo < hi:
+            if lo & 1:
+                res = max(res, tree[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                res = max(res, tree[hi])
+            lo >>= 1
+            hi >>= 1
+        return res
+
+
 class LRUCache:
 
-    def __init__(self, capacity: int = 1_000) -> None:
+    def __init__(self, capacity: int = 1_000, *, size: int = 0) -> None:
         self.capacity: int = capacity
-        self._cache: OrderedDict[Tuple[int, int], int] = OrderedDict()
-
-    def get(self, key: Tuple[int, int]) -> int:
-        if key in self._cache:
-            self._cache.move_to_end(key)
-            return self._cache[key]
-        return -1
-
-    def put(self, key: Tuple[int, int], value: int) -> None:
-        if key in self._cache:
-            self._cache.move_to_end(key)
-        self._cache[key] = value
+        # звичайний dict зберігає порядок вставки: перший ключ — найстаріший;
+        # значення — (сума, версія на момент запису)
+        self._cache: dict[int, Tuple[int, int]] = {}
+        # лінива інвалідація: версія останнього Update для кожної комірки;
+        # size — розмір масиву, якщо відомий (інакше дерево росте за потреби)
+        self._version: int = 0
+        self._cell_versions = MaxSegmentTree(size)
+
+    def get(self, key: int) -> int | object:
+        entry = self._cache.get(key, _MISS)
+        if entry is _MISS:
+            return _MISS
+        value, version = entry
+        if version < self._version and self._cell_versions.range_max(
+            key >> 32, key & _RIGHT_MASK
+        ) > version:
+            del self._cache[key]  # запис застарів
+            return _MISS
+        if key != next(reversed(self._cache)):  # уже найсвіжіший — не переставляємо
+            del self._cache[key]
+            self._cache[key] = entry
+        return value
+
+    def put(self, key: int, value: int) -> None:
+        self._cache.pop(key, None)
+        self._cache[key] = (value, self._version)
         if len(self._cache) > self.capacity:
-            self._cache.popitem(last=False)
+            del self._cache[next(iter(self._cache))]
 
     def invalidate_ranges_containing(self, index: int) -> None:
-        for key in list(self._cache.keys()):
-            left, right = key
-            if left <= index <= right:
-                del self._cache[key]
+        self._version += 1
+        self._cell_versions.point_update(index, self._version)
+
+# 2. Масив із префіксними сумами
+
+class PrefixSumArray:
+
+    def __init__(self, values: np.ndarray) -> None:
+        self.values: np.ndarray = np.array(values, dtype=np.int64)
+        self.prefix: np.ndarray = np.empty(len(self.values) + 1, dtype=np.int64)
+        self.prefix[0] = 0
+        np.cumsum(self.values, out=self.prefix[1:])
+        # найменший індекс, після якого prefix застарів (len — усе актуально)
+        self._dirty: int = len(self.values)
 
-# 2. Чотири функції
+    def __len__(self) -> int:
+        return len(self.values)
 
-Array = List[int]
+    def __getitem__(self, index: int) -> int:
+        return int(self.values[index])
+
+    def __setitem__(self, index: int, value: int) -> None:
+        self.values[index] = value
+        if index < self._dirty:
+            self._dirty = index
+
+    def _rebuild(self) -> None:
+        start = self._dirty
+        tail = self.prefix[start + 1 :]
+        np.cumsum(self.values[start:], out=tail)
+        tail += self.prefix[start]
+        self._dirty = len(self.values)
+
+    def range_sum(self, left: int, right: int) -> int:
+        if self._dirty <= right:
+            self._rebuild()
+        return int(self.prefix[right + 1] - self.prefix[left])
+
+    def range_sums(self, lefts: np.ndarray, rights: np.ndarray) -> np.ndarray:
+        if len(rights) and self._dirty <= rights.max():
+            self._rebuild()
+        return self.prefix[rights + 1] - self.prefix[lefts]
+
+    def run_queries_jit(self, ops: np.ndarray, p0: np.ndarray, p1: np.ndarray) -> int:
+        # ядро Numba оновлює values/prefix на місці й повертає новий dirty
+        checksum, self._dirty = _checksum_jit(
+            self.values, self.prefix, self._dirty, ops, p0, p1
+        )
+        return int(checksum)
+
+
+# Гарячі діапазони: суми рахуються одним numpy-виразом і ніколи не витісняються;
+# при Update відповідні суми коригуються на різницю значень.
+class HotRanges:
+
+    def __init__(self, keys: np.ndarray, array: PrefixSumArray) -> None:
+        sums = array.range_sums(keys >> 32, keys & _RIGHT_MASK)
+        self._sums: dict[int, int] = dict(zip(keys.tolist(), sums.tolist()))
+
+    def get(self, key: int) -> int | None:
+        return self._sums.get(key)
+
+    def apply_update(self, index: int, delta: int) -> None:
+        for key, total in self._sums.items():
+            if key >> 32 <= index <= key & _RIGHT_MASK:
+                self._sums[key] = total + delta
+
+# 3. Чотири функції
+
+Array = PrefixSumArray
 
 
 def range_sum_no_cache(array: Array, left: int, right: int) -> int:
-    return sum(array[left : right + 1])
+    return array.range_sum(left, right)
 
 def update_no_cache(array: Array, index: int, value: int) -> None:
     array[index] = value
@@ -46,10 +171,10 @@ def update_no_cache(array: Array, index: int, value: int) -> None:
 def range_sum_with_cache(
     array: Array, left: int, right: int, cache: LRUCache
 ) -> int:
-    key = (left, right)
+    key = (left << 32) | right
     res = cache.get(key)
-    if res == -1:
-        res = sum(array[left : right + 1])
+    if res is _MISS:
+        res = array.range_sum(left, right)
         cache.put(key, res)
     return res
 
@@ -57,61 +182,172 @@ def update_with_cache(array: Array, index: int, value: int, cache: LRUCache) ->
     array[index] = value
     cache.invalidate_ranges_containing(index)
 
-# 3. Генерація запитів
-
-def make_queries(n, q, hot_pool=30, p_hot=0.95, p_update=0.03):
-    hot = [(random.randint(0, n//2), random.randint(n//2, n-1))
-           for _ in range(hot_pool)]
-    queries = []
-    for _ in range(q):
-        if random.random() < p_update:        # ~3% запитів — Update
-            idx = random.randint(0, n-1)
-            val = random.randint(1, 100)
-            queries.append(("Update", idx, val))
-        else:                                 # ~97% — Range
-            if random.random() < p_hot:       # 95% — «гарячі» діапазони
-                left, right = random.choice(hot)
-            else:                             # 5% — випадкові діапазони
-                left = random.randint(0, n-1)
-                right = random.randint(left, n-1)
-            queries.append(("Range", left, right))
-    return queries
-
-# 4. вимірювання часу
-
-def _run_queries(array: Array, queries, use_cache: bool = False) -> float:
-    cache = LRUCache(1_000) if use_cache else None
-    t0 = time.perf_counter()
+# 4. Генерація запитів
+
+RANGE, UPDATE = 0, 1
+Queries = Tuple[np.ndarray, np.ndarray, np.ndarray]  # (op, p0, p1)
+
+
+def make_queries(n, q, hot_pool=30, p_hot=0.95, p_update=0.03, rng=None) -> Queries:
+    rng = np.random.default_rng() if rng is None else rng
+    hot_l = rng.integers(0, n // 2 + 1, hot_pool)
+    hot_r = rng.integers(n // 2, n, hot_pool)
+    is_update = rng.random(q) < p_update      # ~3% запитів — Update
+    is_hot = rng.random(q) < p_hot            # 95% Range — «гарячі» діапазони
+    hot_idx = rng.integers(0, hot_pool, q)
+    cold_l = rng.integers(0, n, q)            # 5% — випадкові діапазони
+    cold_r = rng.integers(cold_l, n)
+    upd_idx = rng.integers(0, n, q)
+    upd_val = rng.integers(1, 101, q)
+
+    ops = np.where(is_update, UPDATE, RANGE).astype(np.int8)
+    p0 = np.where(is_update, upd_idx, np.where(is_hot, hot_l[hot_idx], cold_l))
+    p1 = np.where(is_update, upd_val, np.where(is_hot, hot_r[hot_idx], cold_r))
+    return ops, p0.astype(np.int32), p1.astype(np.int32)
+
+
+def find_hot_ranges(queries: Queries, min_count: int = 50) -> np.ndarray:
+    ops, p0, p1 = queries
+    is_range = ops == RANGE
+    keys = (p0[is_range].astype(np.int64) << 32) | p1[is_range]
+    unique, counts = np.unique(keys, return_counts=True)
+    return unique[counts >= min_count]
+
+# 5. Numba-версія циклу запитів (лише без кешу)
+
+@njit(
+    "UniTuple(int64, 2)(int64[:], int64[:], int64, int8[:], int32[:], int32[:])",
+    cache=True,
+)
+def _checksum_jit(values, prefix, dirty, ops, p0, p1):
+    n = values.shape[0]
     checksum = 0
-    for typ, *params in queries:
-        if typ == "Range":
-            left, right = params
-            if cache:
-                checksum ^= range_sum_with_cache(array, left, right, cache)
-            else:
-                checksum ^= range_sum_no_cache(array, left, right)
+    for i in range(ops.shape[0]):
+        if ops[i] == RANGE:
+            right = p1[i]
+            if dirty <= right:
+                for j in range(dirty, n):
+                    prefix[j + 1] = prefix[j] + values[j]
+                dirty = n
+            checksum ^= prefix[right + 1] - prefix[p0[i]]
         else:
-            idx, val = params
-            if cache:
-                update_with_cache(array, idx, val, cache)
-            else:
-                update_no_cache(array, idx, val)
+            values[p0[i]] = p1[i]
+            if p0[i] < dirty:
+                dirty = p0[i]
+    return checksum, dirty
+
+
+def _run_queries_jit(array: Array, queries: Queries) -> Tuple[float, int]:
+    ops, p0, p1 = queries
+    t0 = time.perf_counter()
+    checksum = array.run_queries_jit(ops, p0, p1)
+    return time.perf_counter() - t0, checksum
+
+# 6. Векторизована версія без кешу: серії Range між Update — одним numpy-виразом
+
+def _run_queries_numpy(array: Array, queries: Queries) -> Tuple[float, int]:
+    ops, p0, p1 = queries
+    updates = np.flatnonzero(ops == UPDATE).tolist()
+    bounds = list(zip([-1] + updates, updates + [len(ops)]))
+    upd_idx, upd_val = p0.tolist(), p1.tolist()
+    t0 = time.perf_counter()
+    # відповіді всіх Range; на місцях Update лишається 0 — нейтральний для XOR
+    answers = np.zeros(len(ops), dtype=np.int64)
+    for prev, stop in bounds:
+        if prev >= 0:
+            array[upd_idx[prev]] = upd_val[prev]
+        if prev + 1 < stop:
+            run = slice(prev + 1, stop)
+            answers[run] = array.range_sums(p0[run], p1[run])
+    checksum = int(np.bitwise_xor.reduce(answers))
+    return time.perf_counter() - t0, checksum
+
+# 7. вимірювання часу
+
+MODES = ("plain", "jit", "numpy", "lru", "functools")
+
+
+def _run_queries(
+    array: Array,
+    queries: Queries,
+    mode: str = "plain",
+    hot_keys: np.ndarray | None = None,
+) -> Tuple[float, int]:
+    # plain / jit / numpy — без кешу; lru — LRUCache + HotRanges; functools — lru_cache
+    if mode not in MODES:
+        raise ValueError(f"Невідомий режим {mode!r}, очікується один із {MODES}")
+    if mode == "jit":
+        return _run_queries_jit(array, queries)
+    if mode == "numpy":
+        return _run_queries_numpy(array, queries)
+    # таблиця обробників, індекс — код операції (RANGE / UPDATE)
+    if mode == "lru":
+        cache = LRUCache(1_000, size=len(array))
+        hot = HotRanges(np.empty(0, dtype=np.int64) if hot_keys is None else hot_keys, array)
+
+        def on_range(left: int, right: int) -> int:
+            res = hot.get((left << 32) | right)
+            if res is None:
+                res = range_sum_with_cache(array, left, right, cache)
+            return res
+
+        def on_update(index: int, value: int) -> None:
+            hot.apply_update(index, value - array[index])
+            update_with_cache(array, index, value, cache)
+
+        handlers = (on_range, on_update)
+    elif mode == "functools":
+        # C-реалізація LRU; точкової інвалідації немає, тож Update очищає весь кеш
+        cached_range_sum = lru_cache(maxsize=1_000)(array.range_sum)
+
+        def on_update(index: int, value: int) -> None:
+            array[index] = value
+            cached_range_sum.cache_clear()
+
+        handlers = (cached_range_sum, on_update)
+    else:
+        handlers = (partial(range_sum_no_cache, array), partial(update_no_cache, array))
+    ops, p0, p1 = queries
+    calls = [
+        (handlers[op], a, b) for op, a, b in zip(ops.tolist(), p0.tolist(), p1.tolist())
+    ]
+    t0 = time.perf_counter()
+    checksum = 0
+    for fn, a, b in calls:
+        checksum ^= fn(a, b) or 0
     time_spent = time.perf_counter() - t0
-    return time_spent
+    return time_spent, checksum
 
 
 def benchmark(n: int = 100_000, q: int = 50_000) -> None:
-    base = [random.randint(1, 100) for _ in range(n)]
+    base = np.random.randint(1, 101, size=n, dtype=np.int64)
     queries = make_queries(n, q)
+    hot_keys = find_hot_ranges(queries)
 
-    t_no_cache = _run_queries(base.copy(), queries, use_cache=False)
+    t_no_cache, c_no_cache = _run_queries(PrefixSumArray(base), queries, mode="plain")
 
-    t_with_cache = _run_queries(base.copy(), queries, use_cache=True)
+    t_no_cache_jit, c_no_cache_jit = _run_queries(PrefixSumArray(base), queries, mode="jit")
 
-    speedup = t_no_cache / t_with_cache if t_with_cache else float("inf")
-    print(f"Без кешу : {t_no_cache:8.2f} s")
-    print(f"LRU‑кеш  : {t_with_cache:8.2f} s  (прискорення ×{speedup:.1f})")
+    t_no_cache_numpy, c_no_cache_numpy = _run_queries(
+        PrefixSumArray(base), queries, mode="numpy"
+    )
 
+    t_with_cache, c_with_cache = _run_queries(
+        PrefixSumArray(base), queries, mode="lru", hot_keys=hot_keys
+    )
+
+    t_functools, c_functools = _run_queries(PrefixSumArray(base), queries, mode="functools")
+
+    # однакові контрольні суми — усі варіанти відповіли на запити однаково
+    speedup = t_no_cache / t_with_cache if t_with_cache else float("inf")
+    print(f"Без кешу : {t_no_cache:8.2f} s  checksum {c_no_cache}")
+    print(f"Numba    : {t_no_cache_jit:8.2f} s  checksum {c_no_cache_jit}")
+    print(f"NumPy    : {t_no_cache_numpy:8.2f} s  checksum {c_no_cache_numpy}")
+    print(
+        f"LRU‑кеш  : {t_with_cache:8.2f} s  checksum {c_with_cache}"
+        f"  (прискорення ×{speedup:.1f})"
+    )
+    print(f"lru_cache: {t_functools:8.2f} s  checksum {c_functools}")
 
 if __name__ == "__main__":
     benchmark()
